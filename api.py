@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Lightweight JSON API serving the same data as the Streamlit UI.
+
+Endpoints (GET only):
+    /api/health                 status and cache memory usage
+    /api/<SYMBOL>/history
+    /api/<SYMBOL>/indicators
+    /api/<SYMBOL>/forecast?days=30
+    /api/<SYMBOL>/analysis
+
+Every response carries an ETag and Last-Modified derived from the price data
+version, so clients and the Cloudflare edge can revalidate with conditional
+GETs and get a 304 instead of a full recomputation. Analysis ETags are weak,
+since the AI text for one data version is not byte-for-byte reproducible.
+"""
+import json
+import os
+import re
+import sys
+import time
+from datetime import timedelta
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+import pandas as pd
+
+import app
+import cache
+
+API_PORT = int(os.environ.get('STOCK_API_PORT', '8502'))
+API_MAX_AGE = app.PRICE_CACHE_TTL
+ANALYSIS_MAX_AGE = 3600
+SYMBOL_PATTERN = re.compile(r'^[A-Za-z0-9.\-^=]{1,15}$')
+ENDPOINTS = ('history', 'indicators', 'forecast', 'analysis')
+
+# Forecasts keyed by data version, so they are recomputed only when prices change
+_forecast_cache = cache.BoundedCache('api_forecasts', cache.memory_budget)
+
+def frame_records(df, columns):
+    """Convert selected DataFrame columns into JSON-friendly records"""
+    out = df[columns].astype(float).replace({np.nan: None})
+    records = out.to_dict(orient='records')
+    for date, record in zip(df.index.strftime('%Y-%m-%d'), records):
+        record['Date'] = date
+    return records
+
+def build_history(symbol, df):
+    return {
+        'symbol': symbol,
+        'data': frame_records(df, ['Open', 'High', 'Low', 'Close', 'Volume'])
+    }
+
+def build_indicators(symbol, df):
+    df = app.calculate_indicators(df)
+    return {
+        'symbol': symbol,
+        'data': frame_records(df, ['Close', 'MA20', 'MA50', 'RSI', 'MACD', 'Signal_Line'])
+    }
+
+def build_forecast(symbol, df, version, days):
+    key = (symbol, version, days)
+    forecast = _forecast_cache.get(key)
+    if forecast is None:
+        model, scaler = app.get_forecast_model(symbol, df)
+        if model is None:
+            predictions = []
+        else:
+            predictions = app.predict_prices(model, df, scaler, days_to_predict=days).tolist()
+        future_dates = pd.date_range(start=df.index[-1] + timedelta(days=1),
+                                     periods=len(predictions), freq='B')
+        forecast = [
+            {'Date': date, 'Predicted': price}
+            for date, price in zip(future_dates.strftime('%Y-%m-%d'), predictions)
+        ]
+        _forecast_cache[key] = forecast
+    return {'symbol': symbol, 'days': days, 'data': forecast}
+
+def build_analysis(symbol, df):
+    key, analysis = app.get_cached_analysis(symbol, df)
+    if key is None:
+        raise RuntimeError(analysis)
+    return {'symbol': symbol, 'analysis': analysis}
+
+class StockAPIHandler(BaseHTTPRequestHandler):
+    server_version = 'StockAPI/1.0'
+
+    def log_message(self, format, *args):
+        if os.environ.get('STOCK_API_LOG'):
+            super().log_message(format, *args)
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_not_modified(self, headers):
+        self.send_response(304)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def is_not_modified(self, etag, modified):
+        """Evaluate If-None-Match first (weak comparison), falling back to If-Modified-Since"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [t.strip().removeprefix('W/') for t in if_none_match.split(',')]
+            return '*' in tags or etag.removeprefix('W/') in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(modified) <= int(since)
+        return False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split('/') if p]
+        query = parse_qs(url.query)
+
+        if parts == ['api', 'health']:
+            self.send_json(200, {'status': 'ok', 'time': time.time(), 'memory': cache.memory_stats()},
+                           {'Cache-Control': 'no-store'})
+            return
+
+        if len(parts) != 3 or parts[0] != 'api' or parts[2] not in ENDPOINTS:
+            self.send_json(404, {'error': 'Not found'})
+            return
+
+        symbol, endpoint = parts[1].upper(), parts[2]
+        if not SYMBOL_PATTERN.match(symbol):
+            self.send_json(400, {'error': f'Invalid symbol: {symbol}'})
+            return
+
+        days = 30
+        if endpoint == 'forecast':
+            try:
+                days = int(query.get('days', ['30'])[0])
+            except ValueError:
+                self.send_json(400, {'error': 'days must be an integer'})
+                return
+            if not 1 <= days <= 60:
+                self.send_json(400, {'error': 'days must be between 1 and 60'})
+                return
+
+        try:
+            entry = app.get_price_history(symbol)
+        except Exception as e:
+            self.send_json(502, {'error': f'Error loading stock data: {e}'},
+                           {'Cache-Control': 'no-store'})
+            return
+        if len(entry['data']) == 0:
+            self.send_json(404, {'error': f'No data for {symbol}'})
+            return
+
+        version = entry['version']
+        max_age = ANALYSIS_MAX_AGE if endpoint == 'analysis' else API_MAX_AGE
+        etag = f'"{version}-{endpoint}-{days}"' if endpoint == 'forecast' else f'"{version}-{endpoint}"'
+        if endpoint == 'analysis':
+            # AI text is regenerated after eviction and differs between processes
+            etag = f'W/{etag}'
+        headers = {
+            'ETag': etag,
+            'Last-Modified': formatdate(entry['modified'], usegmt=True),
+            'Cache-Control': f'public, max-age={max_age}, stale-while-revalidate={max_age}',
+            'Vary': 'Accept-Encoding'
+        }
+
+        if self.is_not_modified(etag, entry['modified']):
+            self.send_not_modified(headers)
+            return
+
+        df = entry['data'].copy()
+        try:
+            if endpoint == 'history':
+                payload = build_history(symbol, df)
+            elif endpoint == 'indicators':
+                payload = build_indicators(symbol, df)
+            elif endpoint == 'forecast':
+                payload = build_forecast(symbol, df, version, days)
+            else:
+                payload = build_analysis(symbol, df)
+        except Exception as e:
+            self.send_json(500, {'error': str(e)}, {'Cache-Control': 'no-store'})
+            return
+
+        payload['version'] = version
+        self.send_json(200, payload, headers)
+
+def run(port=API_PORT):
+    """Serve the JSON API until interrupted"""
+    server = ThreadingHTTPServer(('0.0.0.0', port), StockAPIHandler)
+    print(f"Stock API listening on port {port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down API server...")
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else API_PORT)
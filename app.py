@@ -8,7 +8,13 @@ from sklearn.preprocessing import MinMaxScaler
 from sklearn.ensemble import RandomForestRegressor
 import requests
 import json
+import hashlib
+import time
+import cache
+from concurrent.futures import ThreadPoolExecutor
 import warnings
+from forest import CompiledForest, compile_forest
+from portfolio import parse_holdings, normalize_weights, price_matrix, analyze_portfolio
 warnings.filterwarnings('ignore')
 
 # Page config
@@ -28,6 +34,10 @@ if 'ai_analysis' not in st.session_state:
     st.session_state.ai_analysis = None
 if 'stock_suggestions' not in st.session_state:
     st.session_state.stock_suggestions = []
+if 'portfolio_holdings' not in st.session_state:
+    st.session_state['portfolio_holdings'] = 'AAPL 0.25, MSFT 0.25, GOOGL 0.2, AMZN 0.15, NVDA 0.15'
+# Re-assign the holdings so Streamlit keeps them while the text area is hidden in Single Stock mode
+st.session_state['portfolio_holdings'] = st.session_state['portfolio_holdings']
 
 def get_stock_suggestions(user_input):
     """Get stock symbol suggestions using DeepSeek AI"""
@@ -130,11 +140,100 @@ def get_deepseek_analysis(symbol, historical_data):
     except Exception as e:
         return f"Analysis Error: {str(e)}"
 
-def load_stock_data():
+# Process-wide price cache shared by every session in this process
+PRICE_CACHE_TTL = 300
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+ANALYSIS_ERROR_PREFIXES = ('API Error', 'Analysis Error', 'DeepSeek API key not found')
+_price_cache = cache.price_cache
+_model_cache = cache.model_cache
+_analysis_cache = cache.analysis_cache
+
+def data_version(data):
+    """Fingerprint of a price history, changes whenever a new bar or revised close arrives"""
+    if len(data) == 0:
+        return 'empty'
+    last = data.iloc[-1]
+    key = f"{len(data)}|{data.index[-1].isoformat()}|{last['Close']:.6f}|{last.get('Volume', 0)}"
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+def period_offset(period):
+    """DateOffset for a yfinance period string such as '5d', '6mo' or '2y'"""
+    for suffix, unit in (('mo', 'months'), ('d', 'days'), ('y', 'years')):
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    return None
+
+def merge_price_history(cached, fresh, period="2y"):
+    """Append newly fetched bars to a cached history, replacing overlapping days"""
+    if len(fresh) == 0:
+        return cached
+    fresh = fresh[PRICE_COLUMNS].copy()
+    tz = cached.index.tz
+    if fresh.index.tz is None:
+        fresh.index = fresh.index.tz_localize(tz) if tz is not None else fresh.index
+    else:
+        fresh.index = fresh.index.tz_convert(tz) if tz is not None else fresh.index.tz_localize(None)
+    merged = pd.concat([cached.loc[cached.index < fresh.index[0], PRICE_COLUMNS], fresh])
+    offset = period_offset(period)
+    if offset is not None:
+        merged = merged[merged.index >= merged.index[-1] - offset]
+    return merged
+
+def get_price_history(symbol, period="2y", max_age=PRICE_CACHE_TTL):
+    """Fetch price history through the process-wide cache.
+
+    Entries older than max_age seconds (including ones seeded from the warm
+    bundle) are refreshed incrementally by fetching only the bars since the
+    last cached day.
+    """
+    symbol = symbol.upper()
+    key = (symbol, period)
+    entry = _price_cache.get(key)
+    if entry and time.time() - entry['fetched'] < max_age:
+        return entry
+
+    # Concurrent misses for the same symbol wait for a single download
+    with cache.key_lock('prices', key):
+        entry = _price_cache.get(key)
+        now = time.time()
+        if entry and now - entry['fetched'] < max_age:
+            return entry
+
+        if entry and len(entry['data']) > 0:
+            try:
+                start = entry['data'].index[-1].strftime('%Y-%m-%d')
+                fresh = yf.Ticker(symbol).history(start=start)
+            except Exception:
+                # Keep serving the cached history while the upstream is unavailable
+                entry['fetched'] = now
+                return entry
+            data = merge_price_history(entry['data'], fresh, period)
+        else:
+            data = yf.Ticker(symbol).history(period=period)
+        version = data_version(data)
+        # Keep the original modification time when a refresh returns the same data
+        modified = entry['modified'] if entry and entry['version'] == version else now
+        entry = {'data': data, 'version': version, 'modified': modified, 'fetched': now}
+        _price_cache[key] = entry
+        return entry
+
+def get_price_histories(symbols, period="2y", max_workers=16):
+    """Fetch many symbols through the price cache, downloading misses concurrently"""
+    def fetch(symbol):
+        try:
+            return symbol, get_price_history(symbol, period)['data']
+        except Exception:
+            return symbol, pd.DataFrame()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(executor.map(fetch, symbols))
+
+def load_stock_data(symbol=None):
     """Load stock data from yfinance"""
     try:
-        stock = yf.Ticker(st.session_state['selected_stock'])
-        data = stock.history(period="2y")
+        symbol = symbol or st.session_state['selected_stock']
+        stock = yf.Ticker(symbol)
+        data = get_price_history(symbol)['data'].copy()
         return stock, data
     except Exception as e:
         st.error(f"Error loading stock data: {e}")
@@ -179,8 +278,64 @@ def train_model(X, y):
     model.fit(X.reshape(X.shape[0], -1), y.reshape(-1))
     return model
 
+def get_forecast_model(symbol, data, lookback=60):
+    """Return a (CompiledForest, scaler) pair, trained once per symbol and data version"""
+    key = (symbol.upper(), data_version(data))
+    cached = _model_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Concurrent misses for the same model wait for a single training run
+    with cache.key_lock('models', key):
+        cached = _model_cache.get(key)
+        if cached is None:
+            X, y, scaler = prepare_data(data[['Close']], lookback)
+            if len(X) == 0:
+                return None, scaler
+            cached = (compile_forest(train_model(X, y)), scaler)
+            _model_cache[key] = cached
+        return cached
+
+def refresh_warm_entry(symbol, period):
+    """Bring a warm bundle entry up to date and train its model if new bars arrived"""
+    entry = get_price_history(symbol, period, max_age=0)
+    if len(entry['data']) > 0:
+        get_forecast_model(symbol, entry['data'])
+
+# Serve the bundle right away and bring it up to date in the background
+cache.load_warm_bundle(refresh=refresh_warm_entry)
+
+def get_cached_analysis(symbol, data):
+    """Return (key, analysis), sharing one DeepSeek call per symbol and data version.
+
+    Failed calls are returned with a None key and never cached, so the next
+    request retries.
+    """
+    key = (symbol.upper(), data_version(data))
+    analysis = _analysis_cache.get(key)
+    if analysis is None:
+        analysis = get_deepseek_analysis(symbol, data)
+        if analysis.startswith(ANALYSIS_ERROR_PREFIXES):
+            return None, analysis
+        _analysis_cache[key] = analysis
+    return key, analysis
+
+def session_analysis():
+    """AI analysis for this session, looked up in the shared cache by key"""
+    analysis = st.session_state.ai_analysis
+    if isinstance(analysis, tuple):
+        analysis = _analysis_cache.get(analysis)
+        if analysis is None:
+            # Evicted under memory pressure, the user can request it again
+            st.session_state.ai_analysis = None
+    return analysis
+
 def predict_prices(model, data, scaler, lookback=60, days_to_predict=30):
     """Predict future stock prices"""
+    # Single-row predictions go through the flat-array forest to skip sklearn's per-call overhead
+    if not isinstance(model, CompiledForest):
+        model = compile_forest(model)
+
     last_sequence = data['Close'].values[-lookback:]
     scaled_last_sequence = scaler.transform(last_sequence.reshape(-1, 1))
     
@@ -202,12 +357,13 @@ def display_stock_info(df, stock_symbol):
         df = calculate_indicators(df)
         
         # AI Analysis Results at the top
-        if st.session_state.ai_analysis:
+        ai_analysis = session_analysis()
+        if ai_analysis:
             st.subheader("🤖 AI Market Analysis")
-            st.markdown(st.session_state.ai_analysis)
+            st.markdown(ai_analysis)
             st.download_button(
                 label="Download Analysis",
-                data=st.session_state.ai_analysis,
+                data=ai_analysis,
                 file_name=f"{stock_symbol}_analysis.txt",
                 mime="text/plain"
             )
@@ -226,9 +382,8 @@ def display_stock_info(df, stock_symbol):
         
         # Price Prediction
         st.subheader("Price Prediction")
-        X, y, scaler = prepare_data(df[['Close']])
-        if len(X) > 0:
-            model = train_model(X, y)
+        model, scaler = get_forecast_model(stock_symbol, df)
+        if model is not None:
             predictions = predict_prices(model, df, scaler, days_to_predict=st.session_state['prediction_days'])
             
             last_date = df.index[-1]
@@ -267,13 +422,127 @@ def display_stock_info(df, stock_symbol):
             fig_rsi.update_layout(title='RSI', height=400)
             st.plotly_chart(fig_rsi, use_container_width=True)
 
+def display_portfolio(holdings_text, window):
+    """Display multi-symbol portfolio analytics"""
+    try:
+        holdings = parse_holdings(holdings_text)
+    except ValueError:
+        st.error("Holdings must be entered as 'SYMBOL weight' pairs, e.g. AAPL 0.3, MSFT 0.7")
+        return
+    if not holdings:
+        st.info("Enter at least one holding to analyze.")
+        return
+
+    with st.spinner(f'Loading {len(holdings)} holdings...'):
+        histories = get_price_histories(list(holdings))
+    prices = price_matrix(histories)
+    missing = [s for s in holdings if s not in prices.columns]
+    if missing:
+        st.warning(f"No price data for: {', '.join(missing)}")
+    if prices.empty:
+        return
+
+    try:
+        symbols, weights = normalize_weights({s: holdings[s] for s in prices.columns})
+        result = analyze_portfolio(prices[symbols], weights, window=window)
+    except ValueError as e:
+        st.error(str(e))
+        return
+
+    st.subheader("Portfolio Metrics")
+    metrics_cols = st.columns(4)
+    with metrics_cols[0]:
+        st.metric("Holdings", f"{len(symbols)}")
+    with metrics_cols[1]:
+        st.metric("Total Return", f"{result['total_return']*100:.2f}%")
+    with metrics_cols[2]:
+        st.metric("Annualized Volatility", f"{result['volatility']*100:.2f}%")
+    with metrics_cols[3]:
+        st.metric("Max Drawdown", f"{result['max_drawdown']*100:.2f}%")
+    st.caption(f"Common history: {prices.index[0]:%Y-%m-%d} to {prices.index[-1]:%Y-%m-%d}")
+
+    perf_cols = st.columns(2)
+    with perf_cols[0]:
+        fig_equity = go.Figure()
+        fig_equity.add_trace(go.Scatter(x=result['dates'], y=result['equity'], name='Equity'))
+        fig_equity.update_layout(title='Portfolio Growth of $1', height=400)
+        st.plotly_chart(fig_equity, use_container_width=True)
+    with perf_cols[1]:
+        fig_dd = go.Figure()
+        fig_dd.add_trace(go.Scatter(x=result['dates'], y=result['drawdown'] * 100,
+                                    name='Drawdown', fill='tozeroy'))
+        fig_dd.update_layout(title='Drawdown (%)', height=400)
+        st.plotly_chart(fig_dd, use_container_width=True)
+
+    risk_cols = st.columns(2)
+    with risk_cols[0]:
+        fig_vol = go.Figure()
+        fig_vol.add_trace(go.Scatter(x=result['dates'], y=result['rolling_volatility'] * 100,
+                                     name='Rolling Volatility'))
+        fig_vol.update_layout(title=f'{window}-Day Rolling Volatility (%)', height=400)
+        st.plotly_chart(fig_vol, use_container_width=True)
+    with risk_cols[1]:
+        rolling_corr = result['rolling_correlation']
+        top = result['holdings'].index[:10]
+        fig_corr = go.Figure()
+        fig_corr.add_trace(go.Scatter(x=rolling_corr.index, y=rolling_corr.mean(axis=1),
+                                      name='Average', line=dict(width=3)))
+        for symbol in top:
+            fig_corr.add_trace(go.Scatter(x=rolling_corr.index, y=rolling_corr[symbol],
+                                          name=symbol, opacity=0.6))
+        fig_corr.update_layout(title=f'{window}-Day Rolling Correlation to Portfolio', height=400)
+        st.plotly_chart(fig_corr, use_container_width=True)
+
+    st.subheader("Correlation Matrix")
+    corr = result['correlation']
+    fig_heatmap = go.Figure(go.Heatmap(z=corr.values, x=corr.columns, y=corr.index,
+                                       zmin=-1, zmax=1, colorscale='RdBu_r'))
+    fig_heatmap.update_layout(height=max(400, min(1200, 12 * len(symbols))))
+    st.plotly_chart(fig_heatmap, use_container_width=True)
+
+    st.subheader("Holdings Risk")
+    table = result['holdings'].copy()
+    percent_columns = ['Weight', 'Volatility', 'Total Return', 'Risk Contribution']
+    table[percent_columns] *= 100
+    st.dataframe(table, use_container_width=True, column_config={
+        **{c: st.column_config.NumberColumn(c, format="%.2f%%") for c in percent_columns},
+        'Correlation to Portfolio': st.column_config.NumberColumn(format="%.2f")
+    })
+
+def display_memory_usage():
+    """Show shared cache usage against the process memory budget"""
+    stats = cache.memory_stats()
+    with st.expander("Cache Memory"):
+        if stats['limit_bytes'] > 0:
+            st.progress(min(stats['used_bytes'] / stats['limit_bytes'], 1.0),
+                        text=f"{stats['used_bytes'] / 2**20:.1f} / {stats['limit_bytes'] / 2**20:.0f} MB")
+        else:
+            st.caption("Caching is disabled (STOCK_CACHE_BUDGET_MB=0)")
+        st.caption(f"Evictions: {stats['evictions']}")
+        for name, info in stats['caches'].items():
+            st.caption(f"{name}: {info['entries']} entries, {info['bytes'] / 2**20:.1f} MB")
+
 def main():
     st.title("Stock Trading App with AI Assistant 📈")
     
     # Sidebar
     with st.sidebar:
         st.header("Settings")
-        
+
+        mode = st.radio("Mode", ["Single Stock", "Portfolio"], horizontal=True, key="mode")
+        if mode == "Portfolio":
+            holdings_text = st.text_area("Holdings (symbol and weight)",
+                                         key='portfolio_holdings',
+                                         height=150)
+            window = st.slider("Rolling Window (days)", 20, 120, 60)
+
+        display_memory_usage()
+
+    if mode == "Portfolio":
+        display_portfolio(holdings_text, window)
+        return
+
+    with st.sidebar:
         # Stock search
         stock_search = st.text_input("Search for stocks", value="", key="stock_search")
         
@@ -308,7 +577,9 @@ def main():
         # Handle AI Analysis
         if ai_analysis_button:
             with st.spinner('Generating AI Analysis...'):
-                st.session_state.ai_analysis = get_deepseek_analysis(st.session_state['selected_stock'], df)
+                # Sessions keep only the cache key; errors are kept as text
+                key, analysis = get_cached_analysis(st.session_state['selected_stock'], df)
+                st.session_state.ai_analysis = key or analysis
         
         # Display stock information
         display_stock_info(df, st.session_state['selected_stock'])
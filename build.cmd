@@ -61,7 +61,7 @@ echo ^</html^>
 ) > build_output\index.html
 
 echo Copying necessary files...
-for %%f in (app.py start.py requirements.txt requirements-dev.txt) do (
+for %%f in (app.py api.py cache.py forest.py portfolio.py start.py requirements.txt requirements-dev.txt) do (
     if exist %%f copy %%f build_output\
 )
 
@@ -179,7 +179,7 @@ const headers = `/*
 fs.writeFileSync(path.join('build_output', '_headers'), headers);
 
 // Copy necessary files
-const filesToCopy = ['app.py', 'start.py', 'requirements.txt', 'requirements-dev.txt'];
+const filesToCopy = ['app.py', 'api.py', 'cache.py', 'forest.py', 'portfolio.py', 'start.py', 'requirements.txt', 'requirements-dev.txt'];
 filesToCopy.forEach(file => {
     if (fs.existsSync(file)) {
         fs.copyFileSync(file, path.join('build_output', file));
@@ -1,30 +1,101 @@
-import os
+import compileall
+import json
 import shutil
 from pathlib import Path
 
-# Create build directory
-build_dir = Path('build_output')
-if build_dir.exists():
-    shutil.rmtree(build_dir)
-build_dir.mkdir()
-
-# Files to copy
-files_to_copy = [
-    'app.py',
-    'start.py',
-    'worker.js',
-    'requirements.txt',
-    '.env',
-    'wrangler.toml'
-]
-
-# Copy files
-for file in files_to_copy:
-    if Path(file).exists():
-        shutil.copy2(file, build_dir)
-
-# Create static directory
-static_dir = build_dir / 'static'
-static_dir.mkdir(exist_ok=True)
-
-print("Build completed successfully!")
+def load_build_config():
+    """Read build.config.json, returning an empty config when it is missing"""
+    config_path = Path('build.config.json')
+    if not config_path.exists():
+        return {}
+    with open(config_path) as f:
+        return json.load(f)
+
+def read_price_file(path, timezone):
+    """Read a local OHLCV CSV (Date index) into the shape yfinance returns"""
+    import pandas as pd
+
+    df = pd.read_csv(path, index_col=0)
+    index = pd.to_datetime(df.index)
+    # Plain dates are local exchange days; only convert indexes that carry an offset
+    df.index = index.tz_localize(timezone) if index.tz is None else index.tz_convert(timezone)
+    df.index.name = 'Date'
+    return df[['Open', 'High', 'Low', 'Close', 'Volume']].sort_index()
+
+def build_warm_bundle(output_dir, config):
+    """Precompute price histories and forecast models from local data files"""
+    import app
+    import cache
+
+    data_dir = Path(config.get('data_dir', 'data'))
+    timezone = config.get('timezone', 'America/New_York')
+    if not data_dir.exists():
+        print(f"Warm bundle skipped: data directory '{data_dir}' not found")
+        return None
+
+    snapshots = {}
+    for symbol in config.get('tickers', []):
+        symbol = symbol.upper()
+        path = data_dir / f'{symbol}.csv'
+        if not path.exists():
+            print(f"Warm bundle: no data file for {symbol}, skipping")
+            continue
+        data = read_price_file(path, timezone)
+        if len(data) == 0:
+            continue
+        forest, scaler = app.get_forecast_model(symbol, data)
+        snapshots[symbol] = {
+            'data': data,
+            'version': app.data_version(data),
+            'forest': forest,
+            'scaler': scaler
+        }
+        print(f"Warm bundle: {symbol} ({len(data)} rows)")
+
+    if not snapshots:
+        print("Warm bundle skipped: no tickers with local data")
+        return None
+    return cache.save_warm_bundle(output_dir, snapshots)
+
+def main():
+    # Create build directory
+    build_dir = Path('build_output')
+    if build_dir.exists():
+        shutil.rmtree(build_dir)
+    build_dir.mkdir()
+
+    # Files to copy
+    files_to_copy = [
+        'app.py',
+        'api.py',
+        'cache.py',
+        'forest.py',
+        'portfolio.py',
+        'start.py',
+        'worker.js',
+        'requirements.txt',
+        '.env',
+        'wrangler.toml'
+    ]
+
+    # Copy files
+    for file in files_to_copy:
+        if Path(file).exists():
+            shutil.copy2(file, build_dir)
+
+    # Create static directory
+    static_dir = build_dir / 'static'
+    static_dir.mkdir(exist_ok=True)
+
+    # Precompile bytecode so instances skip compilation at boot
+    compileall.compile_dir(str(build_dir), quiet=1)
+
+    # Optional warm bundle of prices and models
+    warm_config = load_build_config().get('warm_bundle', {})
+    if warm_config.get('enabled'):
+        build_warm_bundle(build_dir / warm_config.get('output', 'warm_bundle'), warm_config)
+
+    print("Build completed successfully!")
+
+if __name__ == '__main__':
+    main()
@@ -73,7 +73,7 @@ EOL
 
 # Copy necessary files
 echo "Copying files..."
-for file in app.py start.py requirements.txt requirements-dev.txt; do
+for file in app.py api.py cache.py forest.py portfolio.py start.py requirements.txt requirements-dev.txt; do
     if [ -f "$file" ]; then
         cp "$file" build_output/
     else
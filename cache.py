@@ -0,0 +1,339 @@
+"""Process-wide caches, their memory budget and the prewarmed bundle that seeds them.
+
+Streamlit re-executes app.py as a script on every rerun, so state that must
+survive reruns and be shared between sessions lives in this imported module
+instead. The JSON API runs in its own process and keeps its own copies.
+
+Every cache is a BoundedCache charged against one process-wide MemoryBudget
+(STOCK_CACHE_BUDGET_MB, default 256). When the budget is exceeded the least
+recently used entries are evicted across all caches, and entries larger than
+a quarter of the budget are never admitted.
+
+A warm bundle is a directory written by build.py:
+
+    manifest.json      symbols, data versions and scaler ranges
+    prices.pkl         {symbol: DataFrame} with OHLCV price history
+    models/<SYM>.npz   CompiledForest snapshots
+"""
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from forest import CompiledForest
+
+BUNDLE_FORMAT = 1
+CACHE_BUDGET_MB = float(os.environ.get('STOCK_CACHE_BUDGET_MB', '256'))
+MAX_ENTRY_FRACTION = 0.25
+
+def estimate_size(obj, _seen=None):
+    """Approximate memory held by obj in bytes, counting shared objects once"""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k, _seen) + estimate_size(v, _seen)
+                                        for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_size(item, _seen) for item in obj)
+    if hasattr(obj, '__dict__'):
+        return sys.getsizeof(obj) + estimate_size(vars(obj), _seen)
+    return sys.getsizeof(obj)
+
+class MemoryBudget:
+    """Process-wide byte budget shared by every registered BoundedCache.
+
+    Tracks the estimated size of each entry and a single recency order across
+    all caches, so eviction always removes the globally least recently used
+    entry regardless of which cache holds it.
+    """
+
+    def __init__(self, limit_mb=CACHE_BUDGET_MB):
+        # A zero budget admits nothing, which turns caching off
+        self.limit = max(0, int(limit_mb * 2**20))
+        self.used = 0
+        self.caches = {}
+        self.evictions = Counter()
+        self.rejections = Counter()
+        self._lru = OrderedDict()
+        self._lock = threading.RLock()
+
+    def register(self, cache):
+        self.caches[cache.name] = cache
+
+    def touch(self, cache, key):
+        with self._lock:
+            if (cache.name, key) in self._lru:
+                self._lru.move_to_end((cache.name, key))
+
+    def admit(self, cache, key, size):
+        """Charge a new entry, evicting older ones; False if it can never fit"""
+        with self._lock:
+            self.release(cache, key)
+            if size > self.limit * MAX_ENTRY_FRACTION:
+                self.rejections[cache.name] += 1
+                return False
+            self._evict_to(self.limit - size)
+            self._lru[(cache.name, key)] = size
+            self.used += size
+            return True
+
+    def release(self, cache, key):
+        with self._lock:
+            size = self._lru.pop((cache.name, key), None)
+            if size is not None:
+                self.used -= size
+
+    def set_limit(self, limit_mb):
+        """Change the budget, evicting immediately if usage is now above it"""
+        with self._lock:
+            self.limit = max(0, int(limit_mb * 2**20))
+            self._evict_to(self.limit)
+
+    def _evict_to(self, target):
+        """Drop least recently used entries until usage is at most target bytes"""
+        while self._lru and self.used > target:
+            (name, old_key), old_size = self._lru.popitem(last=False)
+            self.caches[name]._evict(old_key)
+            self.used -= old_size
+            self.evictions[name] += 1
+
+    def stats(self):
+        """Current usage, per-cache sizes and eviction counts"""
+        with self._lock:
+            per_cache = {name: {'entries': 0, 'bytes': 0} for name in self.caches}
+            for (name, _), size in self._lru.items():
+                per_cache[name]['entries'] += 1
+                per_cache[name]['bytes'] += size
+            for name, info in per_cache.items():
+                info['evictions'] = self.evictions[name]
+                info['rejections'] = self.rejections[name]
+            return {
+                'limit_bytes': self.limit,
+                'used_bytes': self.used,
+                'evictions': sum(self.evictions.values()),
+                'caches': per_cache
+            }
+
+class BoundedCache(MutableMapping):
+    """Dict-like cache whose entries are accounted against a MemoryBudget.
+
+    Reads refresh an entry's recency. Writes that the budget refuses are
+    dropped, so callers must keep using the value they computed rather than
+    reading it back.
+    """
+
+    def __init__(self, name, budget):
+        self.name = name
+        self.budget = budget
+        self._data = {}
+        budget.register(self)
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        self.budget.touch(self, key)
+        return value
+
+    def __setitem__(self, key, value):
+        size = estimate_size(value)
+        with self.budget._lock:
+            if self.budget.admit(self, key, size):
+                self._data[key] = value
+            else:
+                self._data.pop(key, None)
+
+    def __delitem__(self, key):
+        del self._data[key]
+        self.budget.release(self, key)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(list(self._data))
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        for key in list(self._data):
+            self.pop(key, None)
+
+    def _evict(self, key):
+        self._data.pop(key, None)
+
+memory_budget = MemoryBudget()
+
+# (symbol, period) -> {'data', 'version', 'modified', 'fetched'}
+price_cache = BoundedCache('prices', memory_budget)
+# (symbol, version) -> (CompiledForest, MinMaxScaler)
+model_cache = BoundedCache('models', memory_budget)
+# (symbol, version) -> AI analysis text
+analysis_cache = BoundedCache('analyses', memory_budget)
+
+_loaded_bundles = set()
+
+# (cache name, key) -> [lock, number of threads using it]
+_key_locks = {}
+_key_locks_guard = threading.Lock()
+
+@contextlib.contextmanager
+def key_lock(name, key):
+    """Serialize work on one cache key so concurrent misses share one computation.
+
+    Locks are dropped again once no thread holds or waits for them, so the
+    table stays as small as the set of keys currently being computed.
+    """
+    lock_key = (name, key)
+    with _key_locks_guard:
+        slot = _key_locks.setdefault(lock_key, [threading.Lock(), 0])
+        slot[1] += 1
+    try:
+        with slot[0]:
+            yield
+    finally:
+        with _key_locks_guard:
+            slot[1] -= 1
+            if slot[1] == 0:
+                del _key_locks[lock_key]
+
+def memory_stats():
+    """Cache usage report, including the process resident set size when available"""
+    stats = memory_budget.stats()
+    try:
+        with open('/proc/self/statm') as f:
+            stats['rss_bytes'] = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        stats['rss_bytes'] = None
+    return stats
+
+def python_tag():
+    return sys.implementation.cache_tag
+
+def scaler_from_range(data_min, data_max):
+    """Rebuild a fitted single-column MinMaxScaler from its data range"""
+    scaler = MinMaxScaler()
+    scaler.fit(np.array([[data_min], [data_max]], dtype=float))
+    return scaler
+
+def save_warm_bundle(path, snapshots, period="2y"):
+    """Write a warm bundle.
+
+    snapshots maps symbol -> dict with 'data', 'version', 'forest' and
+    'scaler' (forest/scaler may be None when there was too little history).
+    """
+    path = Path(path)
+    (path / 'models').mkdir(parents=True, exist_ok=True)
+    created = time.time()
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'created': created,
+        'python': python_tag(),
+        'period': period,
+        'symbols': {}
+    }
+    prices = {}
+    for symbol, snap in snapshots.items():
+        prices[symbol] = snap['data']
+        info = {
+            'version': snap['version'],
+            'rows': len(snap['data']),
+            'last_date': snap['data'].index[-1].isoformat(),
+            'model': None
+        }
+        if snap.get('forest') is not None:
+            model_file = f'models/{symbol}.npz'
+            snap['forest'].save(path / model_file)
+            info['model'] = model_file
+            info['scaler'] = [float(snap['scaler'].data_min_[0]), float(snap['scaler'].data_max_[0])]
+        manifest['symbols'][symbol] = info
+
+    pd.to_pickle(prices, path / 'prices.pkl')
+    with open(path / 'manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def read_manifest(path):
+    """Return the bundle manifest, or None when path holds no usable bundle"""
+    manifest_path = Path(path) / 'manifest.json'
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != BUNDLE_FORMAT:
+        return None
+    return manifest
+
+def refresh_warm_bundle(symbols, period, refresh):
+    """Call refresh(symbol, period) for every bundled symbol, skipping failures"""
+    for symbol in symbols:
+        try:
+            refresh(symbol, period)
+        except Exception as e:
+            print(f"Warning: Could not refresh warm bundle entry {symbol}: {e}")
+
+def load_warm_bundle(path=None, refresh=None):
+    """Seed the price and model caches from a warm bundle, once per process.
+
+    With a refresh callback the entries are served as fresh straight away
+    while a background thread calls refresh(symbol, period) for each of them
+    to fetch the bars added since the build. Without one they are marked as
+    fetched when the bundle was built, so get_price_history refreshes a stale
+    bundle on first use. Returns the number of symbols loaded.
+    """
+    path = path or os.environ.get('WARM_BUNDLE_DIR')
+    if not path:
+        return 0
+    path = str(Path(path).resolve())
+    if path in _loaded_bundles:
+        return 0
+    _loaded_bundles.add(path)
+
+    manifest = read_manifest(path)
+    if manifest is None:
+        return 0
+    prices = pd.read_pickle(Path(path) / 'prices.pkl')
+    period = manifest.get('period', '2y')
+    fetched = time.time() if refresh else manifest['created']
+
+    loaded = []
+    for symbol, info in manifest['symbols'].items():
+        data = prices.get(symbol)
+        if data is None:
+            continue
+        key = (symbol, period)
+        if key not in price_cache:
+            price_cache[key] = {
+                'data': data,
+                'version': info['version'],
+                'modified': manifest['created'],
+                'fetched': fetched
+            }
+        if info.get('model'):
+            forest = CompiledForest.load(Path(path) / info['model'])
+            model_cache[(symbol, info['version'])] = (forest, scaler_from_range(*info['scaler']))
+        loaded.append(symbol)
+
+    if refresh and loaded:
+        threading.Thread(target=refresh_warm_bundle, args=(loaded, period, refresh),
+                         name='warm-bundle-refresh', daemon=True).start()
+    return len(loaded)
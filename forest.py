@@ -0,0 +1,114 @@
+"""Flat-array inference for fitted scikit-learn forest regressors.
+
+`compile_forest` copies every tree of a fitted RandomForestRegressor into a
+handful of contiguous NumPy arrays (feature, threshold, children, value) and
+`CompiledForest.predict` walks all trees for all rows at once. This avoids
+scikit-learn's per-call validation and per-tree dispatch, which dominates
+when predicting one row at a time, and gives identical results.
+"""
+import numpy as np
+
+class CompiledForest:
+    """Contiguous node arrays for a forest of regression trees.
+
+    Node ids are global across trees. Leaves point to themselves through
+    `left`/`right` so a fixed number of traversal steps (the maximum tree
+    depth) lands every row on its leaf without per-row branching.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left,
+                                      self.right, self.value, self.roots))
+
+    def apply(self, X):
+        """Return the leaf node id reached in every tree, shape (n_samples, n_trees)"""
+        # scikit-learn evaluates splits on float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[1]} features, but the forest expects {self.n_features}")
+
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict(self, X):
+        """Average of the leaf values across trees, matching RandomForestRegressor.predict"""
+        return self.value[self.apply(X)].mean(axis=1)
+
+    def save(self, path):
+        """Write the forest to a compressed .npz file"""
+        np.savez_compressed(
+            path,
+            feature=self.feature, threshold=self.threshold,
+            left=self.left, right=self.right, value=self.value, roots=self.roots,
+            meta=np.array([self.max_depth, self.n_features], dtype=np.int64)
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Read a forest written by `save`"""
+        with np.load(path) as data:
+            max_depth, n_features = data['meta']
+            return cls(data['feature'], data['threshold'], data['left'], data['right'],
+                       data['value'], data['roots'], max_depth, n_features)
+
+def compile_forest(model):
+    """Convert a fitted single-output RandomForestRegressor into a CompiledForest"""
+    estimators = getattr(model, 'estimators_', None)
+    if not estimators:
+        raise ValueError("compile_forest requires a fitted forest")
+    if getattr(model, 'n_outputs_', 1) != 1:
+        raise ValueError("compile_forest only supports single-output regressors")
+
+    trees = [est.tree_ for est in estimators]
+    counts = np.array([t.node_count for t in trees])
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    n_nodes = int(counts.sum())
+    n_features = model.n_features_in_
+    index_dtype = np.int32 if n_nodes < np.iinfo(np.int32).max else np.int64
+    feature_dtype = np.int16 if n_features < np.iinfo(np.int16).max else np.int32
+
+    feature = np.empty(n_nodes, dtype=feature_dtype)
+    threshold = np.empty(n_nodes, dtype=np.float64)
+    left = np.empty(n_nodes, dtype=index_dtype)
+    right = np.empty(n_nodes, dtype=index_dtype)
+    value = np.empty(n_nodes, dtype=np.float64)
+
+    for tree, offset, count in zip(trees, offsets, counts):
+        nodes = slice(offset, offset + count)
+        local = np.arange(count)
+        is_leaf = tree.children_left == -1
+        # Leaves loop back to themselves and test feature 0 against +inf
+        feature[nodes] = np.where(is_leaf, 0, tree.feature)
+        threshold[nodes] = np.where(is_leaf, np.inf, tree.threshold)
+        left[nodes] = np.where(is_leaf, local, tree.children_left) + offset
+        right[nodes] = np.where(is_leaf, local, tree.children_right) + offset
+        value[nodes] = tree.value[:, 0, 0]
+
+    max_depth = max(t.max_depth for t in trees)
+    return CompiledForest(feature, threshold, left, right, value,
+                          offsets.astype(index_dtype), max_depth, n_features)
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""Concurrent-session load test for the Streamlit app.
+
+Drives app.py headlessly through Streamlit's AppTest, one AppTest per
+simulated session, with yfinance and the DeepSeek API replaced by fake
+backends. Every session replays an interaction script (symbol changes,
+slider moves, AI analysis clicks) and each rerun is timed. The run is
+repeated for each concurrency level and reports rerun latency percentiles,
+throughput and process memory, giving a capacity curve for one instance.
+
+    python loadtest.py --sessions 1,2,4,8,16 --rounds 2
+    python loadtest.py --sessions 4 --ai-latency 2.0 --distinct-symbols --json results.json
+"""
+import argparse
+import ast
+import contextlib
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+APP_PATH = str(Path(__file__).parent / 'app.py')
+SYMBOLS = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'META', 'TSLA', 'JPM', 'V', 'WMT']
+
+# Each step is (action, argument); a rerun is timed after every step
+DEFAULT_SCRIPT = [
+    ('load', None),
+    ('slider', 14),
+    ('analysis', None),
+    ('symbol', 1),
+    ('slider', 45),
+    ('search', 'cloud software'),
+    ('search', ''),
+    ('symbol', 0),
+]
+
+class FakeTicker:
+    """Deterministic stand-in for yfinance.Ticker with configurable latency"""
+    latency = 0.0
+    rows = 504
+
+    def __init__(self, symbol):
+        self.symbol = symbol.upper()
+
+    def history(self, period="2y", start=None):
+        time.sleep(self.latency)
+        seed = sum(ord(c) for c in self.symbol)
+        rng = np.random.default_rng(seed)
+        index = pd.bdate_range(end='2025-01-31', periods=self.rows, tz='America/New_York', name='Date')
+        close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.015, self.rows))
+        data = pd.DataFrame({
+            'Open': close * (1 + rng.normal(0, 0.003, self.rows)),
+            'High': close * 1.01,
+            'Low': close * 0.99,
+            'Close': close,
+            'Volume': rng.integers(1_000_000, 50_000_000, self.rows).astype(float)
+        }, index=index)
+        if start is not None:
+            data = data[data.index >= pd.Timestamp(start, tz=index.tz)]
+        return data
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, content):
+        self._content = content
+
+    def json(self):
+        return {'choices': [{'message': {'content': self._content}}]}
+
+def fake_deepseek_post(latency):
+    """Build a requests.post replacement answering like the DeepSeek chat API"""
+    def post(url, headers=None, json=None, **kwargs):
+        time.sleep(latency)
+        prompt = json['messages'][-1]['content'] if json else ''
+        if 'suggest up to 5' in prompt:
+            return FakeResponse('AAPL, MSFT, GOOGL')
+        return FakeResponse('1. Technical Analysis: neutral\n2. Market Sentiment: mixed\n'
+                            '3. Risk Assessment: Medium\n4. Price Target: flat\n5. Indicators: RSI 50')
+    return post
+
+def current_rss_mb():
+    """Resident set size of this process in MB"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+class MemorySampler(threading.Thread):
+    """Track the highest RSS seen while a concurrency level runs"""
+
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = current_rss_mb()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, current_rss_mb())
+
+    def finish(self):
+        self._done.set()
+        self.join()
+        return self.peak
+
+def find_widget(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"Widget '{label}' not found")
+
+def apply_step(at, action, arg, symbols):
+    """Perform one interaction on an AppTest session without running it"""
+    if action == 'slider':
+        find_widget(at.slider, 'Prediction Days').set_value(arg)
+    elif action == 'symbol':
+        find_widget(at.text_input, 'Or enter stock symbol directly').set_value(symbols[arg % len(symbols)])
+    elif action == 'analysis':
+        at.button(key='ai_analysis_button').click()
+    elif action == 'search':
+        at.text_input(key='stock_search').set_value(arg)
+    elif action != 'load':
+        raise ValueError(f"Unknown script action: {action}")
+
+def run_session(session_id, script, rounds, symbols, timeout, barrier, results):
+    """Replay the interaction script and record every rerun latency"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.secrets['DEEPSEEK_API_KEY'] = 'loadtest'
+    latencies, errors = [], 0
+    barrier.wait()
+    for _ in range(rounds):
+        for action, arg in script:
+            try:
+                apply_step(at, action, arg, symbols)
+                start = time.perf_counter()
+                at.run()
+                latencies.append(time.perf_counter() - start)
+                if at.exception:
+                    errors += 1
+            except Exception:
+                errors += 1
+    results[session_id] = (latencies, errors)
+
+def session_symbols(session_id, distinct):
+    """Symbols a session cycles through, shared across sessions unless distinct"""
+    if distinct:
+        return [f'S{session_id:03d}A', f'S{session_id:03d}B']
+    # Rotate the shared list so sessions do not move in lockstep
+    offset = session_id % len(SYMBOLS)
+    return SYMBOLS[offset:] + SYMBOLS[:offset]
+
+@contextlib.contextmanager
+def shared_apptest_globals():
+    """Make concurrent AppTest sessions behave like one Streamlit server.
+
+    AppTest is built for one session at a time: every run compiles app.py
+    into a fresh ScriptCache (adding compile time to each measured rerun and
+    calling ast.parse from several threads at once) and clears the global
+    Runtime instance when it finishes, while other sessions may still be
+    running. Share one script cache, compile the script up front, serialize
+    ast.parse and keep the last runtime available to every session.
+    """
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.testing.v1 import app_test
+
+    lock = threading.Lock()
+    parse = ast.parse
+
+    def locked_parse(*args, **kwargs):
+        with lock:
+            return parse(*args, **kwargs)
+
+    original_instance = Runtime.instance.__func__
+    last_runtime = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last_runtime['runtime'] = cls._instance
+        return last_runtime.get('runtime') or original_instance(cls)
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch('ast.parse', locked_parse))
+        stack.enter_context(mock.patch.object(Runtime, 'instance', classmethod(instance)))
+        if hasattr(app_test, 'ScriptCache'):
+            shared = app_test.ScriptCache()
+            shared.get_bytecode(APP_PATH)
+            stack.enter_context(mock.patch.object(app_test, 'ScriptCache', lambda: shared))
+        yield
+
+def reset_caches(clear):
+    """Start a level with zeroed eviction counters, emptying every cache if clear"""
+    import cache
+    if clear:
+        for bounded in cache.memory_budget.caches.values():
+            bounded.clear()
+    cache.memory_budget.evictions.clear()
+    cache.memory_budget.rejections.clear()
+
+def run_level(sessions, script, rounds, distinct, timeout, cold):
+    """Run one concurrency level and summarize it"""
+    reset_caches(clear=cold)
+    results = {}
+    barrier = threading.Barrier(sessions + 1)
+    threads = [
+        threading.Thread(target=run_session,
+                         args=(i, script, rounds, session_symbols(i, distinct), timeout, barrier, results))
+        for i in range(sessions)
+    ]
+    for thread in threads:
+        thread.start()
+
+    sampler = MemorySampler()
+    rss_before = current_rss_mb()
+    sampler.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    rss_peak = sampler.finish()
+    import cache
+    cache_stats = cache.memory_stats()
+
+    latencies = np.array([l for lats, _ in results.values() for l in lats])
+    errors = sum(err for _, err in results.values())
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (np.nan,) * 3
+    return {
+        'sessions': sessions,
+        'reruns': int(len(latencies)),
+        'errors': int(errors),
+        'elapsed_s': elapsed,
+        'throughput_rps': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'p50_ms': p50 * 1000,
+        'p95_ms': p95 * 1000,
+        'p99_ms': p99 * 1000,
+        'rss_start_mb': rss_before,
+        'rss_peak_mb': rss_peak,
+        'rss_end_mb': current_rss_mb(),
+        'cache_mb': cache_stats['used_bytes'] / 2**20,
+        'cache_evictions': cache_stats['evictions']
+    }
+
+def print_report(rows):
+    header = (f"{'sessions':>8} {'reruns':>7} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+              f"{'rerun/s':>8} {'rss MB':>8} {'peak MB':>8} {'cache MB':>8} {'evicted':>7}")
+    print(header)
+    print('-' * len(header))
+    for r in rows:
+        print(f"{r['sessions']:>8} {r['reruns']:>7} {r['errors']:>6} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} "
+              f"{r['p99_ms']:>9.1f} {r['throughput_rps']:>8.2f} {r['rss_end_mb']:>8.1f} {r['rss_peak_mb']:>8.1f} "
+              f"{r['cache_mb']:>8.1f} {r['cache_evictions']:>7}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sessions', default='1,2,4,8',
+                        help='comma-separated concurrency levels (default: 1,2,4,8)')
+    parser.add_argument('--rounds', type=int, default=1,
+                        help='times each session replays the interaction script')
+    parser.add_argument('--ai-latency', type=float, default=0.5,
+                        help='seconds the fake DeepSeek API takes per call')
+    parser.add_argument('--data-latency', type=float, default=0.05,
+                        help='seconds the fake yfinance takes per history call')
+    parser.add_argument('--distinct-symbols', action='store_true',
+                        help='give every session its own symbols (no shared cache hits)')
+    parser.add_argument('--warm', action='store_true',
+                        help='keep caches between levels instead of starting each level cold')
+    parser.add_argument('--cache-budget', type=float,
+                        help='process-wide cache budget in MB (default: STOCK_CACHE_BUDGET_MB)')
+    parser.add_argument('--timeout', type=float, default=120,
+                        help='per-rerun timeout in seconds')
+    parser.add_argument('--json', help='also write the results to this JSON file')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    levels = [int(n) for n in args.sessions.split(',') if n.strip()]
+    FakeTicker.latency = args.data_latency
+    sys.path.insert(0, str(Path(APP_PATH).parent))
+    if args.cache_budget:
+        import cache
+        cache.memory_budget.set_limit(args.cache_budget)
+
+    rows = []
+    with mock.patch('yfinance.Ticker', FakeTicker), \
+            mock.patch('requests.post', fake_deepseek_post(args.ai_latency)), \
+            shared_apptest_globals():
+        for sessions in levels:
+            print(f"Running {sessions} concurrent session(s)...", flush=True)
+            rows.append(run_level(sessions, DEFAULT_SCRIPT, args.rounds, args.distinct_symbols,
+                                  args.timeout, cold=not args.warm))
+
+    print()
+    print_report(rows)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+    return rows
+
+if __name__ == '__main__':
+    main()
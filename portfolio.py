@@ -0,0 +1,182 @@
+"""Vectorized multi-symbol portfolio analytics.
+
+Everything here works on a single aligned (time x symbols) NumPy array so the
+cost grows with one matrix operation per metric rather than one Python loop
+iteration per holding.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+def parse_holdings(text):
+    """Parse 'SYMBOL weight' pairs separated by commas or new lines.
+
+    Weights are optional; holdings without a weight are equally weighted
+    against each other. A '%' suffix marks a percentage (30% == 0.3).
+    Repeated symbols have their weights added together.
+    """
+    holdings = {}
+    for item in re.split(r'[,\n;]+', text):
+        tokens = item.replace(':', ' ').replace('=', ' ').split()
+        if not tokens:
+            continue
+        symbol = tokens[0].upper()
+        weight = np.nan
+        if len(tokens) > 1:
+            weight = float(tokens[1].rstrip('%'))
+            if tokens[1].endswith('%'):
+                weight /= 100
+        previous = holdings.get(symbol, np.nan)
+        if np.isnan(previous):
+            holdings[symbol] = weight
+        elif not np.isnan(weight):
+            holdings[symbol] = previous + weight
+    return holdings
+
+def normalize_weights(holdings):
+    """Return symbols and weights summing to 1, filling missing weights equally"""
+    symbols = list(holdings)
+    weights = np.array([holdings[s] for s in symbols], dtype=float)
+    missing = np.isnan(weights)
+    if missing.all():
+        weights[:] = 1.0
+    elif missing.any():
+        weights[missing] = np.nanmean(weights)
+    total = weights.sum()
+    if total <= 0:
+        raise ValueError("Portfolio weights must sum to a positive value")
+    return symbols, weights / total
+
+def price_matrix(histories):
+    """Align per-symbol Close prices into a (dates x symbols) DataFrame.
+
+    Indexes are normalised to tz-naive calendar dates so listings on
+    different exchanges line up, prices are forward filled over holidays and
+    the frame is cut to the window where every symbol has data.
+    """
+    closes = {}
+    for symbol, df in histories.items():
+        if df is None or len(df) == 0:
+            continue
+        close = df['Close']
+        index = close.index
+        if getattr(index, 'tz', None) is not None:
+            index = index.tz_localize(None)
+        closes[symbol] = pd.Series(close.values, index=index.normalize())
+    if not closes:
+        return pd.DataFrame()
+    prices = pd.DataFrame(closes).sort_index()
+    prices = prices[~prices.index.duplicated(keep='last')]
+    return prices.ffill().dropna()
+
+def returns_matrix(prices):
+    """Simple daily returns as a (T-1 x N) float array"""
+    values = prices.to_numpy(dtype=float)
+    return values[1:] / values[:-1] - 1.0
+
+def covariance(returns, annualize=True):
+    """Sample covariance of the columns of a returns array"""
+    centered = returns - returns.mean(axis=0)
+    cov = centered.T @ centered / (len(returns) - 1)
+    return cov * TRADING_DAYS if annualize else cov
+
+def correlation(cov):
+    """Correlation matrix from a covariance matrix"""
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.outer(std, std)
+    return np.clip(np.nan_to_num(corr), -1.0, 1.0)
+
+def _rolling_sum(values, window):
+    """Trailing window sums along axis 0, NaN until the window is full"""
+    csum = np.cumsum(values, axis=0, dtype=float)
+    out = np.full(values.shape, np.nan)
+    out[window - 1] = csum[window - 1]
+    out[window:] = csum[window:] - csum[:-window]
+    return out
+
+def rolling_volatility(portfolio_returns, window):
+    """Annualized rolling volatility of a single return series"""
+    n = window
+    s1 = _rolling_sum(portfolio_returns, window)
+    s2 = _rolling_sum(portfolio_returns ** 2, window)
+    var = (s2 - s1 ** 2 / n) / (n - 1)
+    return np.sqrt(np.clip(var, 0, None) * TRADING_DAYS)
+
+def rolling_correlation_to(returns, target, window):
+    """Rolling correlation of every column of returns (T x N) with target (T,)"""
+    n = window
+    target = target[:, None]
+    sx = _rolling_sum(returns, window)
+    sy = _rolling_sum(target, window)
+    sxx = _rolling_sum(returns ** 2, window)
+    syy = _rolling_sum(target ** 2, window)
+    sxy = _rolling_sum(returns * target, window)
+    cov = sxy - sx * sy / n
+    var_x = np.clip(sxx - sx ** 2 / n, 0, None)
+    var_y = np.clip(syy - sy ** 2 / n, 0, None)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.sqrt(var_x * var_y)
+    return corr
+
+def drawdown(equity):
+    """Drawdown of an equity curve relative to its running peak"""
+    peak = np.maximum.accumulate(equity)
+    return equity / peak - 1.0
+
+def analyze_portfolio(prices, weights, window=60):
+    """Compute portfolio analytics for aligned prices and matching weights.
+
+    Returns a dict with the aligned dates, the portfolio return, equity,
+    drawdown and rolling volatility series, per-holding rolling correlation
+    to the portfolio, the full covariance/correlation matrices and a
+    per-holding risk summary DataFrame.
+    """
+    symbols = list(prices.columns)
+    weights = np.asarray(weights, dtype=float)
+    returns = returns_matrix(prices)
+    if len(returns) < 2:
+        raise ValueError("Not enough overlapping price history for these holdings")
+    window = max(2, min(window, len(returns)))
+
+    portfolio_returns = returns @ weights
+    equity = np.cumprod(1.0 + portfolio_returns)
+    cov = covariance(returns)
+    corr = correlation(cov)
+
+    marginal = cov @ weights
+    portfolio_vol = float(np.sqrt(weights @ marginal))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        risk_contribution = weights * marginal / portfolio_vol ** 2
+
+    rolling_corr = rolling_correlation_to(returns, portfolio_returns, window)
+    asset_vol = np.sqrt(np.diag(cov))
+    total_return = prices.iloc[-1].to_numpy(dtype=float) / prices.iloc[0].to_numpy(dtype=float) - 1.0
+
+    holdings = pd.DataFrame({
+        'Weight': weights,
+        'Volatility': asset_vol,
+        'Total Return': total_return,
+        'Risk Contribution': risk_contribution,
+        'Correlation to Portfolio': rolling_corr[-1]
+    }, index=symbols).sort_values('Risk Contribution', ascending=False)
+
+    dd = drawdown(equity)
+    dates = prices.index[1:]
+    return {
+        'dates': dates,
+        'returns': portfolio_returns,
+        'equity': equity,
+        'drawdown': dd,
+        'rolling_volatility': rolling_volatility(portfolio_returns, window),
+        'rolling_correlation': pd.DataFrame(rolling_corr, index=dates, columns=symbols),
+        'covariance': pd.DataFrame(cov, index=symbols, columns=symbols),
+        'correlation': pd.DataFrame(corr, index=symbols, columns=symbols),
+        'volatility': portfolio_vol,
+        'max_drawdown': float(dd.min()),
+        'total_return': float(equity[-1] - 1.0),
+        'holdings': holdings
+    }
@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
+import json
 import os
 import signal
 import subprocess
 import sys
+import threading
 import time
 from pathlib import Path
 
@@ -64,10 +66,35 @@ def kill_process_on_port(port):
     except Exception as e:
         print(f"Warning: Could not kill process on port {port}: {e}")
 
+def locate_warm_bundle():
+    """Find the prebuilt warm bundle and export it for the app process"""
+    bundle_dir = Path(os.environ.get('WARM_BUNDLE_DIR', Path(__file__).parent / 'warm_bundle'))
+    manifest_path = bundle_dir / 'manifest.json'
+    if not manifest_path.exists():
+        return None
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable warm bundle: {e}")
+        return None
+
+    os.environ['WARM_BUNDLE_DIR'] = str(bundle_dir.resolve())
+    age_hours = (time.time() - manifest.get('created', time.time())) / 3600
+    print(f"Warm bundle: {len(manifest.get('symbols', {}))} symbols, built {age_hours:.1f}h ago "
+          "(refreshed incrementally after startup)")
+    if manifest.get('python') != sys.implementation.cache_tag:
+        print(f"Warning: Warm bundle bytecode targets {manifest.get('python')}, "
+              f"running {sys.implementation.cache_tag}")
+    return manifest
+
 class StreamlitRunner:
     def __init__(self):
         self.process = None
         self.port = 8501
+        self.api_process = None
+        self.api_port = int(os.environ.get('STOCK_API_PORT', '8502'))
+        self.shutting_down = False
         
     def setup_signal_handlers(self):
         """Set up signal handlers for graceful shutdown"""
@@ -82,15 +109,35 @@ class StreamlitRunner:
     
     def cleanup(self):
         """Clean up resources"""
-        if self.process:
-            try:
-                self.process.terminate()
-                self.process.wait(timeout=5)
-            except:
+        self.shutting_down = True
+        for process in (self.process, self.api_process):
+            if process:
                 try:
-                    self.process.kill()
+                    process.terminate()
+                    process.wait(timeout=5)
                 except:
-                    pass
+                    try:
+                        process.kill()
+                    except:
+                        pass
+
+    def start_api(self):
+        """Start the JSON API server alongside Streamlit"""
+        kill_process_on_port(self.api_port)
+        api_path = Path(__file__).parent / 'api.py'
+        # Output is inherited so the API never blocks on a full pipe
+        self.api_process = subprocess.Popen(
+            [sys.executable, str(api_path), str(self.api_port)],
+            env=os.environ
+        )
+        print(f"Starting JSON API on port {self.api_port}...")
+        threading.Thread(target=self.monitor_api, daemon=True).start()
+
+    def monitor_api(self):
+        """Report the API process exiting while the app is still running"""
+        returncode = self.api_process.wait()
+        if not self.shutting_down:
+            print(f"API process ended unexpectedly (exit code {returncode})")
     
     def run(self):
         """Run the Streamlit application"""
@@ -100,6 +147,12 @@ class StreamlitRunner:
             
             # Kill any existing process
             kill_process_on_port(self.port)
+
+            # Seed caches from the warm bundle, if the build produced one
+            locate_warm_bundle()
+
+            # The API inherits the same environment, including WARM_BUNDLE_DIR
+            self.start_api()
             
             # Get the absolute path to app.py
             app_path = Path(__file__).parent / 'app.py'
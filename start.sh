@@ -1,3 +1,4 @@
 #!/bin/bash
 pip install -r requirements.txt
+python api.py &
 streamlit run app.py --server.port 8501 --server.address 0.0.0.0
@@ -0,0 +1,109 @@
+import json
+import threading
+from email.utils import formatdate
+from http.client import HTTPConnection
+from http.server import ThreadingHTTPServer
+from unittest import mock
+
+import pytest
+
+import api
+import cache
+from loadtest import FakeTicker
+
+@pytest.fixture(scope='module')
+def server():
+    for bounded in cache.memory_budget.caches.values():
+        bounded.clear()
+    with mock.patch('yfinance.Ticker', FakeTicker):
+        httpd = ThreadingHTTPServer(('127.0.0.1', 0), api.StockAPIHandler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        yield httpd.server_address[1]
+        httpd.shutdown()
+        httpd.server_close()
+    for bounded in cache.memory_budget.caches.values():
+        bounded.clear()
+
+def get(port, path, headers=None):
+    conn = HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.request('GET', path, headers=headers or {})
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+def test_history_carries_validators(server):
+    response, body = get(server, '/api/aapl/history')
+    assert response.status == 200
+    payload = json.loads(body)
+    assert payload['symbol'] == 'AAPL' and len(payload['data']) == FakeTicker.rows
+    assert response.getheader('ETag') == f'"{payload["version"]}-history"'
+    assert response.getheader('Last-Modified')
+    assert response.getheader('Cache-Control').startswith('public, max-age=')
+
+def test_if_none_match(server):
+    response, _ = get(server, '/api/AAPL/history')
+    etag = response.getheader('ETag')
+
+    response, body = get(server, '/api/AAPL/history', {'If-None-Match': etag})
+    assert response.status == 304 and body == b''
+    assert response.getheader('ETag') == etag
+    assert response.getheader('Cache-Control') and response.getheader('Last-Modified')
+
+    for header in (f'"stale", W/{etag}', '*'):
+        response, _ = get(server, '/api/AAPL/history', {'If-None-Match': header})
+        assert response.status == 304
+    response, _ = get(server, '/api/AAPL/history', {'If-None-Match': '"stale"'})
+    assert response.status == 200
+
+def test_if_modified_since(server):
+    response, _ = get(server, '/api/AAPL/history')
+    last_modified = response.getheader('Last-Modified')
+    modified = cache.price_cache[('AAPL', '2y')]['modified']
+
+    response, _ = get(server, '/api/AAPL/history', {'If-Modified-Since': last_modified})
+    assert response.status == 304
+    response, _ = get(server, '/api/AAPL/history', {'If-Modified-Since': formatdate(modified - 60, usegmt=True)})
+    assert response.status == 200
+    response, _ = get(server, '/api/AAPL/history', {'If-Modified-Since': 'not a date'})
+    assert response.status == 200
+    # If-None-Match takes precedence over If-Modified-Since
+    response, _ = get(server, '/api/AAPL/history',
+                      {'If-None-Match': '"stale"', 'If-Modified-Since': last_modified})
+    assert response.status == 200
+
+def test_forecast_etag_includes_days(server):
+    response, _ = get(server, '/api/AAPL/forecast?days=5')
+    assert response.status == 200
+    etag = response.getheader('ETag')
+    assert etag.endswith('-forecast-5"')
+    response, _ = get(server, '/api/AAPL/forecast?days=10', {'If-None-Match': etag})
+    assert response.status == 200
+
+def test_analysis_etag_is_weak(server):
+    _, body = get(server, '/api/AAPL/history')
+    version = json.loads(body)['version']
+    response, _ = get(server, '/api/AAPL/analysis', {'If-None-Match': f'"{version}-analysis"'})
+    assert response.status == 304
+    assert response.getheader('ETag') == f'W/"{version}-analysis"'
+
+@pytest.mark.parametrize('path, status', [
+    ('/api/AA$PL/history', 400),
+    ('/api/AAPL/forecast?days=abc', 400),
+    ('/api/AAPL/forecast?days=0', 400),
+    ('/api/AAPL/forecast?days=61', 400),
+    ('/api/AAPL/unknown', 404),
+    ('/api/AAPL', 404),
+    ('/other', 404),
+])
+def test_error_paths(server, path, status):
+    response, body = get(server, path)
+    assert response.status == status
+    assert 'error' in json.loads(body)
+
+def test_health(server):
+    response, body = get(server, '/api/health')
+    assert response.status == 200
+    assert response.getheader('Cache-Control') == 'no-store'
+    assert json.loads(body)['memory']['limit_bytes'] == cache.memory_budget.limit
@@ -0,0 +1,54 @@
+import numpy as np
+
+from cache import BoundedCache, MemoryBudget
+
+KB = 1024
+
+def make_caches(limit_kb):
+    budget = MemoryBudget(limit_mb=limit_kb / 1024)
+    return budget, BoundedCache('a', budget), BoundedCache('b', budget)
+
+def test_evicts_least_recently_used_across_caches():
+    budget, a, b = make_caches(100)
+    a['old'] = np.zeros(20 * KB // 8)
+    b['mid'] = np.zeros(20 * KB // 8)
+    a['new'] = np.zeros(20 * KB // 8)
+    # Reading 'old' makes 'mid' the least recently used entry
+    a['old']
+    b['big'] = np.zeros(24 * KB // 8)
+    b['more'] = np.zeros(24 * KB // 8)
+
+    assert 'mid' not in b
+    assert 'old' in a and 'new' in a
+    assert budget.used <= budget.limit
+    assert budget.evictions == {'b': 1}
+    assert budget.stats()['caches']['a']['entries'] == 2
+
+def test_rejects_entries_over_a_quarter_of_the_budget():
+    budget, a, _ = make_caches(100)
+    a['small'] = np.zeros(KB // 8)
+    a['huge'] = np.zeros(30 * KB // 8)
+
+    assert 'huge' not in a
+    assert 'small' in a
+    assert budget.rejections == {'a': 1}
+    assert budget.evictions == {}
+
+def test_replacing_and_clearing_release_their_bytes():
+    budget, a, b = make_caches(100)
+    a['x'] = np.zeros(10 * KB // 8)
+    a['x'] = np.zeros(5 * KB // 8)
+    assert budget.used == 5 * KB
+    b['y'] = np.zeros(5 * KB // 8)
+    a.clear()
+    b.clear()
+    assert budget.used == 0
+    assert len(a) == len(b) == 0
+
+def test_zero_budget_caches_nothing():
+    budget, a, _ = make_caches(0)
+    a['x'] = np.zeros(8)
+    assert 'x' not in a
+    assert budget.used == 0 and budget.rejections == {'a': 1}
+    budget.set_limit(-1)
+    assert budget.limit == 0
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from forest import CompiledForest, compile_forest
+
+@pytest.fixture(scope='module')
+def fitted():
+    rng = np.random.default_rng(0)
+    X = rng.random((300, 12))
+    y = X[:, 0] * 3 + np.sin(X[:, 1] * 6) + rng.normal(0, 0.1, 300)
+    model = RandomForestRegressor(n_estimators=25, random_state=42).fit(X, y)
+    X_test = np.random.default_rng(1).random((200, 12))
+    return model, X_test
+
+def test_batch_matches_sklearn(fitted):
+    model, X_test = fitted
+    forest = compile_forest(model)
+    np.testing.assert_allclose(forest.predict(X_test), model.predict(X_test), rtol=0, atol=1e-12)
+
+def test_single_row_matches_sklearn(fitted):
+    model, X_test = fitted
+    forest = compile_forest(model)
+    for row in X_test[:10]:
+        row = row.reshape(1, -1)
+        np.testing.assert_allclose(forest.predict(row), model.predict(row), rtol=0, atol=1e-12)
+
+def test_save_load_round_trip(fitted, tmp_path):
+    model, X_test = fitted
+    forest = compile_forest(model)
+    forest.save(tmp_path / 'forest.npz')
+    loaded = CompiledForest.load(tmp_path / 'forest.npz')
+    np.testing.assert_array_equal(loaded.predict(X_test), forest.predict(X_test))
+
+def test_rejects_wrong_feature_count(fitted):
+    model, X_test = fitted
+    with pytest.raises(ValueError):
+        compile_forest(model).predict(X_test[:, :5])
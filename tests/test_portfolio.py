@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio import (analyze_portfolio, covariance, normalize_weights, parse_holdings,
+                       rolling_correlation_to, rolling_volatility, TRADING_DAYS)
+
+@pytest.fixture(scope='module')
+def returns():
+    rng = np.random.default_rng(0)
+    common = rng.normal(0, 0.01, (400, 1))
+    return common + rng.normal(0.0003, 0.01, (400, 4))
+
+def test_percent_weights():
+    assert parse_holdings('AAPL 30%, MSFT 0.7') == {'AAPL': 0.3, 'MSFT': 0.7}
+
+def test_missing_weights_take_the_mean_weight():
+    holdings = parse_holdings('AAPL\nMSFT: 0.5; GOOGL=0.3')
+    assert np.isnan(holdings['AAPL'])
+    symbols, weights = normalize_weights(holdings)
+    assert symbols == ['AAPL', 'MSFT', 'GOOGL']
+    np.testing.assert_allclose(weights, np.array([0.4, 0.5, 0.3]) / 1.2)
+    _, weights = normalize_weights(parse_holdings('aapl, msft'))
+    np.testing.assert_allclose(weights, [0.5, 0.5])
+
+def test_repeated_symbols_are_added():
+    assert parse_holdings('AAPL 0.2, MSFT 0.5, aapl 0.3') == {'AAPL': 0.5, 'MSFT': 0.5}
+
+def test_bad_input_raises():
+    with pytest.raises(ValueError):
+        parse_holdings('AAPL abc')
+    with pytest.raises(ValueError):
+        normalize_weights({'AAPL': 0.0, 'MSFT': 0.0})
+
+def test_covariance_matches_numpy(returns):
+    np.testing.assert_allclose(covariance(returns, annualize=False), np.cov(returns, rowvar=False))
+    np.testing.assert_allclose(covariance(returns), np.cov(returns, rowvar=False) * TRADING_DAYS)
+
+def test_rolling_volatility_matches_pandas(returns):
+    series = returns[:, 0]
+    expected = pd.Series(series).rolling(30).std().to_numpy() * np.sqrt(TRADING_DAYS)
+    np.testing.assert_allclose(rolling_volatility(series, 30), expected, rtol=1e-8, equal_nan=True)
+
+def test_rolling_correlation_matches_pandas(returns):
+    target = returns.mean(axis=1)
+    frame = pd.DataFrame(returns)
+    expected = frame.rolling(30).corr(pd.Series(target)).to_numpy()
+    np.testing.assert_allclose(rolling_correlation_to(returns, target, 30), expected,
+                               rtol=1e-8, equal_nan=True)
+
+def test_risk_contributions_sum_to_one(returns):
+    prices = pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), columns=['A', 'B', 'C', 'D'],
+                          index=pd.bdate_range('2023-01-02', periods=len(returns)))
+    result = analyze_portfolio(prices, [0.4, 0.3, 0.2, 0.1], window=60)
+    assert result['holdings']['Risk Contribution'].sum() == pytest.approx(1.0)
+    assert result['volatility'] == pytest.approx(np.std(result['returns'], ddof=1) * np.sqrt(TRADING_DAYS))
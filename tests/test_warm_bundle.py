@@ -0,0 +1,83 @@
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+import build
+import cache
+
+TIMEZONE = 'America/New_York'
+
+def write_csv(path, dates):
+    rng = np.random.default_rng(0)
+    close = 100 * np.cumprod(1 + rng.normal(0.0005, 0.01, len(dates)))
+    pd.DataFrame({
+        'Date': dates,
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': rng.integers(1_000_000, 5_000_000, len(dates))
+    }).to_csv(path, index=False)
+
+@pytest.fixture
+def clean_caches():
+    for bounded in cache.memory_budget.caches.values():
+        bounded.clear()
+    cache._loaded_bundles.clear()
+    yield
+    for bounded in cache.memory_budget.caches.values():
+        bounded.clear()
+    cache._loaded_bundles.clear()
+
+@pytest.fixture
+def bundle(tmp_path, clean_caches):
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    dates = pd.bdate_range('2024-01-02', periods=150).strftime('%Y-%m-%d')
+    write_csv(data_dir / 'AAPL.csv', dates)
+    config = {'data_dir': str(data_dir), 'timezone': TIMEZONE, 'tickers': ['aapl', 'MSFT']}
+    manifest = build.build_warm_bundle(tmp_path / 'bundle', config)
+    data = build.read_price_file(data_dir / 'AAPL.csv', TIMEZONE)
+    for bounded in cache.memory_budget.caches.values():
+        bounded.clear()
+    return tmp_path / 'bundle', manifest, data
+
+def test_plain_dates_stay_on_exchange_day(tmp_path):
+    write_csv(tmp_path / 'AAPL.csv', ['2024-01-02', '2024-01-03'])
+    df = build.read_price_file(tmp_path / 'AAPL.csv', TIMEZONE)
+    assert df.index[0] == pd.Timestamp('2024-01-02', tz=TIMEZONE)
+    assert list(df.columns) == app.PRICE_COLUMNS
+
+def test_offset_dates_are_converted(tmp_path):
+    write_csv(tmp_path / 'AAPL.csv', ['2024-01-02 14:30:00+00:00', '2024-01-03 14:30:00+00:00'])
+    df = build.read_price_file(tmp_path / 'AAPL.csv', TIMEZONE)
+    assert df.index[0] == pd.Timestamp('2024-01-02 09:30', tz=TIMEZONE)
+
+def test_round_trip_seeds_matching_cache_keys(bundle):
+    path, manifest, data = bundle
+    version = app.data_version(data)
+    assert list(manifest['symbols']) == ['AAPL']
+    assert manifest['symbols']['AAPL']['version'] == version
+
+    assert cache.load_warm_bundle(path) == 1
+    entry = cache.price_cache[('AAPL', '2y')]
+    assert entry['version'] == version == app.data_version(entry['data'])
+    pd.testing.assert_frame_equal(entry['data'], data)
+
+    forest, scaler = cache.model_cache[('AAPL', version)]
+    _, _, fitted_scaler = app.prepare_data(data[['Close']])
+    np.testing.assert_allclose(scaler.data_min_, fitted_scaler.data_min_)
+    np.testing.assert_allclose(scaler.data_max_, fitted_scaler.data_max_)
+
+def test_refresh_without_new_bars_reuses_bundled_model(bundle):
+    path, _, data = bundle
+    cache.load_warm_bundle(path)
+    bundled = cache.model_cache[('AAPL', app.data_version(data))]
+
+    ticker = mock.Mock()
+    ticker.return_value.history.side_effect = lambda start=None, **kwargs: data[data.index >= start]
+    with mock.patch('yfinance.Ticker', ticker):
+        entry = app.get_price_history('AAPL', max_age=0)
+    ticker.return_value.history.assert_called_once()
+    assert entry['version'] == app.data_version(data)
+    assert app.get_forecast_model('AAPL', entry['data']) is bundled
@@ -69,6 +69,41 @@ export default {
         }
       }
 
+      // Forward JSON API requests to the API process and cache them at the edge
+      if (url.pathname.startsWith('/api/')) {
+        const cache = caches.default;
+        const cacheKey = new Request(url.toString(), { method: 'GET' });
+        if (request.method === 'GET') {
+          const cached = await cache.match(cacheKey);
+          if (cached) {
+            return cached;
+          }
+        }
+
+        const apiUrl = new URL(url.pathname + url.search, 'http://127.0.0.1:8502');
+        const response = await fetch(apiUrl.toString(), {
+          method: request.method,
+          headers: {
+            'If-None-Match': request.headers.get('If-None-Match') || '',
+            'If-Modified-Since': request.headers.get('If-Modified-Since') || '',
+            'X-Forwarded-Proto': 'https'
+          }
+        });
+
+        const newHeaders = new Headers(response.headers);
+        Object.entries(corsHeaders).forEach(([key, value]) => {
+          newHeaders.set(key, value);
+        });
+        const apiResponse = new Response(response.body, {
+          status: response.status,
+          headers: newHeaders
+        });
+        if (request.method === 'GET' && response.status === 200) {
+          ctx.waitUntil(cache.put(cacheKey, apiResponse.clone()));
+        }
+        return apiResponse;
+      }
+
       // Handle root path and direct to index.html
       if (url.pathname === '/' || url.pathname === '/index.html') {
         const response = await env.ASSETS.fetch(new Request(new URL('/index.html', request.url)));